@@ -77,23 +77,24 @@ class Result():
 #   * But for now, I don't want to create a cross-dependency with another App.
 
 
+# Note: This is also a Temporal function, but I'm trying to avoid making Temporal a dependency of BTU.
+_CRON_MINUTE = r"(?P<minute>\*(\/[0-5]?\d)?|[0-5]?\d)"
+_CRON_HOUR = r"(?P<hour>\*|[01]?\d|2[0-3])"
+_CRON_DAY = r"(?P<day>\*|0?[1-9]|[12]\d|3[01])"
+_CRON_MONTH = r"(?P<month>\*|0?[1-9]|1[012]|(?i:JAN|FEB|MAR|APR|MAY|JUN|JUL|AUG|SEP|OCT|NOV|DEC))"
+_CRON_DAY_OF_WEEK = r"(?P<day_of_week>\*|[0-6](\-[0-6])?|(?i:SUN|MON|TUE|WED|THU|FRI|SAT))"
+
+# Compiled once at import, instead of on every call to validate_cron_string()
+_CRON_RE = re.compile(
+	rf"^{_CRON_MINUTE}\s+{_CRON_HOUR}\s+{_CRON_DAY}\s+{_CRON_MONTH}\s+{_CRON_DAY_OF_WEEK}\s*$"
+)  # end of re.compile()
+
+
 def validate_cron_string(cron_string, error_on_invalid=False):
 	"""
 	Validate that a string is a Unix cron string.
 	"""
-
-	# Note: This is also a Temporal function, but I'm trying to avoid making Temporal a dependency of BTU.
-	minute_component = r"(?P<minute>\*(\/[0-5]?\d)?|[0-5]?\d)"
-	hour_component = r"(?P<hour>\*|[01]?\d|2[0-3])"
-	day_component = r"(?P<day>\*|0?[1-9]|[12]\d|3[01])"
-	month_component = r"(?P<month>\*|0?[1-9]|1[012])"
-	day_of_week_component = r"(?P<day_of_week>\*|[0-6](\-[0-6])?)"  # end of str.format()
-
-	crontab_time_format_regex = re.compile(
-		rf"{minute_component}\s+{hour_component}\s+{day_component}\s+{month_component}\s+{day_of_week_component}"
-	)  # end of re.compile()
-
-	if crontab_time_format_regex.match(cron_string) is None:
+	if _CRON_RE.match(cron_string) is None:
 		if error_on_invalid:
 			raise Exception(f"String '{cron_string}' is not a valid Unix cron string.")
 		return False
@@ -52,7 +52,17 @@ class SchedulerAPI():
 		return response
 
 
-	def send_message(self, request_type: RequestType, content):
+	@staticmethod
+	def get_socket_path():
+		"""
+		Returns the path to the BTU Scheduler daemon's Unix Domain Socket, from BTU Configuration.
+		"""
+		socket_str = frappe.db.get_single_value("BTU Configuration", "path_to_btu_scheduler_uds")
+		if not socket_str:
+			raise ValueError("BTU Configuration is missing a path to the Unix Domain Socket for the scheduler daemon.")
+		return socket_str
+
+	def send_message(self, request_type: RequestType, content, socket_path=None):
 
 		if not isinstance(request_type, RequestType):
 			raise Exception("Argument 'request_type' must be an enum of RequestType.")
@@ -61,18 +71,18 @@ class SchedulerAPI():
 			'request_content': content
 		}
 		message_as_string = json.dumps(new_message)
-		return self._send_message_to_scheduler_socket(message_as_string)
+		return self._send_message_to_scheduler_socket(message_as_string, socket_str=socket_path)
 
-	def _send_message_to_scheduler_socket(self, message, debug=False):
+	def _send_message_to_scheduler_socket(self, message, debug=False, socket_str=None):
 		"""
 		Establish a connection to the BTU scheduler daemon's Unix Domain Socket, and send a message.
+		NOTE: When 'socket_str' is passed, no database access is required; this is safe to call from other threads.
 		"""
 		if not isinstance(message, str):
 			raise TypeError("Argument 'message' must be a UTF-8 string.")
 
-		socket_str = frappe.db.get_single_value("BTU Configuration", "path_to_btu_scheduler_uds")
 		if not socket_str:
-			raise ValueError("BTU Configuration is missing a path to the Unix Domain Socket for the scheduler daemon.")
+			socket_str = SchedulerAPI.get_socket_path()
 
 		# Create a UDS socket; connect to the port where the BTU Scheduler daemon is listening.
 		socket_path = pathlib.Path(socket_str)
@@ -9,8 +9,12 @@ from __future__ import unicode_literals
 import ast
 import calendar
 from calendar import monthrange, timegm
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import copy
 from datetime import datetime
-from time import gmtime, localtime, mktime
+from functools import lru_cache
+import json
+from time import gmtime, localtime, mktime, time
 
 # Third Party
 import cron_descriptor
@@ -22,7 +26,7 @@ from frappe.model.document import Document
 
 # BTU
 from btu import ( validate_cron_string, Result)
-from btu.btu_api.scheduler import SchedulerAPI
+from btu.btu_api.scheduler import RequestType, SchedulerAPI
 
 
 class BTUTaskSchedule(Document):  # pylint: disable=too-many-instance-attributes
@@ -40,68 +44,36 @@ class BTUTaskSchedule(Document):  # pylint: disable=too-many-instance-attributes
 
 		# Create a friendly, human-readable description based on the cron string:
 		if self.cron_string:
-			self.schedule_description = cron_descriptor.get_description(self.cron_string)
+			doc_orig = self.get_doc_before_save()
+			if not (doc_orig and doc_orig.cron_string == self.cron_string and doc_orig.schedule_description):
+				self.schedule_description = _describe_cron(self.cron_string, frappe.local.lang)
 
 		# Clear fields that are not relevant for this schedule type.
-		if self.run_frequency == "Cron Style":
-			self.day_of_week = None
-			self.day_of_month = None
-			self.month = None
-			self.hour = None
-			self.minute = None
-		if self.run_frequency == "Hourly":
-			self.day_of_week = None
-			self.day_of_month = None
-			self.month = None
-			self.hour = None
-		if self.run_frequency == "Daily":
-			self.day_of_week = None
-			self.day_of_month = None
-			self.month = None
+		for fieldname in _FREQ_CONFIG.get(self.run_frequency, ((), ()))[0]:
+			setattr(self, fieldname, None)
 
 	def validate(self):
-		if self.run_frequency == "Hourly":
-			check_minutes(self.minute)
-			self.cron_string = schedule_to_cron_string(self)
-
-		elif self.run_frequency == "Daily":
-			check_hours(self.hour)
-			check_minutes(self.minute)
-			self.cron_string = schedule_to_cron_string(self)
-
-		elif self.run_frequency == "Weekly":
-			check_day_of_week(self.day_of_week)
-			check_hours(self.hour)
-			check_minutes(self.minute)
-			self.cron_string = schedule_to_cron_string(self)
-
-		elif self.run_frequency == "Monthly":
-			check_day_of_month(self.run_frequency, self.day_of_month)
-			check_hours(self.hour)
-			check_minutes(self.minute)
-			self.cron_string = schedule_to_cron_string(self)
-
-		elif self.run_frequency == "Yearly":
-			check_day_of_month(self.run_frequency, self.day_of_month, self.month)
-			check_hours(self.hour)
-			check_minutes(self.minute)
-			self.cron_string = schedule_to_cron_string(self)
-
-		elif self.run_frequency == "Cron Style":
+		if self.run_frequency == "Cron Style":
 			validate_cron_string(str(self.cron_string))
+		elif self.run_frequency in _FREQ_CONFIG:
+			for check_function, arg_fieldnames in _FREQ_CONFIG[self.run_frequency][1]:
+				check_function(*(getattr(self, fieldname) for fieldname in arg_fieldnames))
+			self.cron_string = schedule_to_cron_string(self)
 
 	def before_save(self):
 
 		if '|' in self.name:
 			raise ValueError("Task Schedules cannot have the pipe character (|) in their primary key 'name'.")
 
+		doc_orig = self.get_doc_before_save()
 		if bool(self.enabled) is True:
+			if doc_orig and all(doc_orig.get(fieldname) == self.get(fieldname) for fieldname in _SCHED_FIELDS):
+				return  # nothing about the schedule changed, so no need to ask the BTU Scheduler to reload it.
 			try:
 				self.resubmit_task_schedule()
 			except Exception as ex:
 				frappe.msgprint(ex, indicator='red')
 		else:
-			doc_orig = self.get_doc_before_save()
 			if doc_orig and doc_orig.enabled != self.enabled:
 				# Request the BTU Scheduler to cancel (if status was not previously Disabled)
 				self.cancel_schedule()
@@ -113,12 +85,7 @@ class BTUTaskSchedule(Document):  # pylint: disable=too-many-instance-attributes
 		Send a request to the BTU Scheduler background daemon to reload this Task Schedule in RQ.
 		"""
 		response = SchedulerAPI.reload_task_schedule(task_schedule_id=self.name)
-		if not response:
-			raise ConnectionError("Error, no response from BTU Task Scheduler daemon.  Check logs in directory '/etc/btu_scheduler.logs'")
-		if response.startswith('Exception while connecting'):
-			raise ConnectionError(response)
-		print(f"Response from BTU Scheduler: {response}")
-		frappe.msgprint(f"Response from BTU Scheduler daemon:<br>{response}")
+		_process_reload_response(response)
 		if autosave:
 			self.save()
 
@@ -133,7 +100,14 @@ class BTUTaskSchedule(Document):  # pylint: disable=too-many-instance-attributes
 		self.redis_job_id = ""
 
 	def get_task_doc(self):
-		return frappe.get_doc("BTU Task", self.task)
+		"""
+		Returns the BTU Task document.  Cached on 'frappe.local', so it only lasts for the current request.
+		"""
+		cache = getattr(frappe.local, '_btu_task_cache', None) or {}
+		if self.task not in cache:
+			cache[self.task] = frappe.get_doc("BTU Task", self.task)
+			frappe.local._btu_task_cache = cache  # pylint: disable=protected-access
+		return cache[self.task]
 
 	@frappe.whitelist()
 	def get_last_execution_results(self):
@@ -146,10 +120,16 @@ class BTUTaskSchedule(Document):  # pylint: disable=too-many-instance-attributes
 		# conn.type('rq:job:TS000001')
 		# conn.hkeys('rq:job:TS000001')
 
+		# Fetch both hash fields in a single round-trip to Redis.
+		# For a finished job 'exc_info' is unset, so asking for it anyway costs nothing extra.
+		pipe = conn.pipeline()
+		pipe.hget(f'rq:job:{self.redis_job_id}', 'status')
+		pipe.hget(f'rq:job:{self.redis_job_id}', 'exc_info')
 		try:
 			# job_data =  conn.hgetall(f'rq:job:{self.redis_job_id}').decode('utf-8')
 			# frappe.msgprint(job_data)
-			job_status =  conn.hget(f'rq:job:{self.redis_job_id}', 'status').decode('utf-8')
+			job_status, compressed_data = pipe.execute()
+			job_status = job_status.decode('utf-8')
 		except Exception:
 			frappe.msgprint(f"No job information is available for Job {self.redis_job_id}")
 			return
@@ -158,12 +138,22 @@ class BTUTaskSchedule(Document):  # pylint: disable=too-many-instance-attributes
 			frappe.msgprint(f"Job {self.redis_job_id} completed successfully.")
 			return
 		frappe.msgprint(f"Job status = {job_status}")
-		compressed_data = conn.hget(f'rq:job:{self.redis_job_id}', 'exc_info')
 		if not compressed_data:
 			frappe.msgprint("No results available; job may not have been processed yet.")
 		else:
 			frappe.msgprint(zlib.decompress(compressed_data))
 
+	@frappe.whitelist()
+	def button_resubmit_task_schedule(self):
+		"""
+		Resubmit this Task Schedule to the BTU Scheduler daemon, even if nothing has changed.
+		Useful when the daemon or Redis has lost its state.
+		"""
+		if not self.enabled:
+			frappe.msgprint("Task Schedule is disabled; there is nothing to resubmit.")
+			return
+		self.resubmit_task_schedule()
+
 	@frappe.whitelist()
 	def button_test_email_via_log(self):
 		"""
@@ -188,20 +178,34 @@ class BTUTaskSchedule(Document):  # pylint: disable=too-many-instance-attributes
 			raise ex
 
 	def built_in_arguments(self):
+		"""
+		Converts the argument overrides String into an argument Dictionary.
+		"""
 		if not self.argument_overrides:
 			return None
-		return ast.literal_eval(self.argument_overrides)
+		try:
+			return json.loads(self.argument_overrides)
+		except json.JSONDecodeError:
+			# Older records may still contain Python literals; the result is cached, so hand back a copy.
+			return copy.deepcopy(_literal_eval_arguments(self.argument_overrides))
 
 # ----------------
 # STATIC FUNCTIONS
 # ----------------
 
+# Fields that define what the BTU Scheduler daemon has scheduled.
+_SCHED_FIELDS = ("cron_string", "run_frequency", "enabled", "task", "queue_name", "argument_overrides")
+
+# Valid values as strings, both with and without a leading zero (e.g. '5' and '05')
+_MINUTES = frozenset(map(str, range(60))) | frozenset(f"{each:02d}" for each in range(60))
+_HOURS = frozenset(map(str, range(24))) | frozenset(f"{each:02d}" for each in range(24))
+
 def check_minutes(minute):
-	if not minute or not 0 <= minute < 60:
+	if minute is None or str(minute) not in _MINUTES:
 		raise ValueError(_("Minute value must be between 0 and 59"))
 
 def check_hours(hour):
-	if not hour or not hour.isdigit() or not 0 <= int(hour) < 24:
+	if hour is None or str(hour) not in _HOURS:
 		raise ValueError(_("Hour value must be between 0 and 23"))
 
 def check_day_of_week(day_of_week):
@@ -209,6 +213,12 @@ def check_day_of_week(day_of_week):
 	if not day_of_week or day_of_week is None:
 		raise ValueError(_("Please select a day of the week"))
 
+_MONTH_ABBR_TO_IDX = {value: key for key, value in enumerate(calendar.month_abbr) if value}
+
+@lru_cache(maxsize=24)
+def _days_in_month(year, month_index):
+	return monthrange(year, month_index)[1]
+
 def check_day_of_month(run_frequency, day, month=None):
 
 	if run_frequency == "Monthly" and not day:
@@ -216,15 +226,71 @@ def check_day_of_month(run_frequency, day, month=None):
 
 	if run_frequency == "Yearly":
 		if day and month:
-			month_dict = {value: key for key, value in enumerate(calendar.month_abbr)}
-			last = monthrange(datetime.now().year,
-							  month_dict.get(str(month).title()))[1]
+			last = _days_in_month(datetime.now().year,
+			                      _MONTH_ABBR_TO_IDX.get(str(month).title()))
 			if int(day) > last:
 				raise ValueError(
 					_("Day value for {0} must be between 1 and {1}").format(month, last))
 		else:
 			raise ValueError(_("Please select a day of the week and a month"))
 
+# For each Run Frequency:  (fields to clear in before_validate, (check function, argument fieldnames) in validate)
+_FREQ_CONFIG = {
+	"Hourly": (
+		("day_of_week", "day_of_month", "month", "hour"),
+		((check_minutes, ("minute",)),)
+	),
+	"Daily": (
+		("day_of_week", "day_of_month", "month"),
+		((check_hours, ("hour",)), (check_minutes, ("minute",)))
+	),
+	"Weekly": (
+		(),
+		((check_day_of_week, ("day_of_week",)), (check_hours, ("hour",)), (check_minutes, ("minute",)))
+	),
+	"Monthly": (
+		(),
+		((check_day_of_month, ("run_frequency", "day_of_month")), (check_hours, ("hour",)), (check_minutes, ("minute",)))
+	),
+	"Yearly": (
+		(),
+		((check_day_of_month, ("run_frequency", "day_of_month", "month")), (check_hours, ("hour",)), (check_minutes, ("minute",)))
+	),
+	"Cron Style": (
+		("day_of_week", "day_of_month", "month", "hour", "minute"),
+		()
+	),
+}
+
+@lru_cache(maxsize=128)
+def _literal_eval_arguments(argument_string):
+	"""
+	Slow path for argument overrides that are Python literals instead of JSON.
+	"""
+	return ast.literal_eval(argument_string)
+
+@lru_cache(maxsize=512)
+def _describe_cron(cron_string, lang):  # pylint: disable=unused-argument
+	"""
+	Human-readable description of a cron string.  The 'lang' argument is only a cache key.
+	"""
+	return cron_descriptor.get_description(cron_string)
+
+@lru_cache(maxsize=2)
+def _utc_offset_hours(bucket):  # pylint: disable=unused-argument
+	"""
+	Hours between local time and UTC.  The 'bucket' argument is only a cache key.
+	"""
+	current_time = localtime()
+	return (timegm(current_time) - timegm(gmtime(mktime(current_time)))) / 3600
+
+def get_utc_time_diff():
+	"""
+	Returns the host's UTC offset in hours.  The value is cached in 30 minute buckets,
+	so a change in Daylight Saving Time is noticed within half an hour.
+	"""
+	return _utc_offset_hours(int(time()) // 1800)
+
 def schedule_to_cron_string(doc_schedule):
 	"""
 	Purpose of this function is to convert individual SQL columns (Hour, Day, Minute, etc.)
@@ -233,27 +299,21 @@ def schedule_to_cron_string(doc_schedule):
 	Input:   A BTU Task Schedule document class.
 	Output:   A Unix cron string.
 	"""
-
-	def get_utc_time_diff():
-		current_time = localtime()
-		return (timegm(current_time) - timegm(gmtime(mktime(current_time)))) / 3600
-
-
 	if not isinstance(doc_schedule, BTUTaskSchedule):
 		raise ValueError("Function argument 'doc_schedule' should be a BTU Task Schedule document.")
 
 	if doc_schedule.run_frequency == 'Cron Style':
 		return doc_schedule.cron_string
 
-	cron = [None] * 5
-	cron[0] = "*" if doc_schedule.minute is None else str(doc_schedule.minute)
-	cron[1] = "*" if doc_schedule.hour is None else str(
-		int(doc_schedule.hour) - get_utc_time_diff())
-	cron[2] = "*" if doc_schedule.day_of_month is None else str(doc_schedule.day_of_month)
-	cron[3] = "*" if doc_schedule.month is None else doc_schedule.month
-	cron[4] = "*" if doc_schedule.day_of_week is None else doc_schedule.day_of_week[:3]
-
-	result = " ".join(cron)
+	# NOTE: Compare with None, because zero is a legitimate value for minute and hour.
+	# The hour is converted to UTC, and wrapped so it stays between 0 and 23.
+	result = (
+		f"{'*' if doc_schedule.minute is None else doc_schedule.minute} "
+		f"{'*' if doc_schedule.hour is None else (int(doc_schedule.hour) - int(get_utc_time_diff())) % 24} "
+		f"{'*' if doc_schedule.day_of_month is None else doc_schedule.day_of_month} "
+		f"{'*' if doc_schedule.month is None else doc_schedule.month} "
+		f"{'*' if doc_schedule.day_of_week is None else doc_schedule.day_of_week[:3]}"
+	)
 
 	validate_cron_string(result, error_on_invalid=True)
 	return result
@@ -265,15 +325,67 @@ def resubmit_all_task_schedules():
 	NOTE: This does -not- immediately execute an RQ Job; it only schedules it.
 	"""
 	filters = { "enabled": True }
-	task_schedule_ids = frappe.db.get_all("BTU Task Schedule", filters=filters, pluck='name')
-	for task_schedule_id in task_schedule_ids:
+	fields = ["name", "task", "run_frequency", "cron_string", "minute", "hour", "day_of_month", "day_of_week", "month"]
+	task_schedules = frappe.db.get_all("BTU Task Schedule", filters=filters, fields=fields)
+	if not task_schedules:
+		return
+
+	doc_schedules = []
+	for task_schedule in task_schedules:
 		try:
-			doc_schedule = frappe.get_doc("BTU Task Schedule", task_schedule_id)
+			# Validation only needs the schedule columns; build the document in memory, without another round-trip.
+			doc_schedule = frappe.get_doc(dict(task_schedule, doctype="BTU Task Schedule"))
 			doc_schedule.validate()
-			doc_schedule.resubmit_task_schedule()
+			doc_schedules.append(doc_schedule)
 		except Exception as ex:
-			message = f"Error from BTU Scheduler while submitting Task {doc_schedule.name} : {ex}"
-			frappe.msgprint(message)
-			print(message)
-			doc_schedule.enabled = False
-			doc_schedule.save()
+			_disable_task_schedule(task_schedule.name, ex)
+
+	if not doc_schedules:
+		return
+
+	# The requests to the BTU Scheduler daemon are independent and I/O-bound, so send them concurrently.
+	# NOTE: Worker threads have no Frappe context; they only talk to the socket.  Everything else stays on this thread.
+	socket_path = SchedulerAPI.get_socket_path()
+	with ThreadPoolExecutor(max_workers=8) as executor:
+		futures = { executor.submit(_send_reload_request, doc_schedule.name, socket_path): doc_schedule
+		            for doc_schedule in doc_schedules }
+		for future in as_completed(futures):
+			doc_schedule = futures[future]
+			try:
+				_process_reload_response(future.result())
+			except Exception as ex:
+				_disable_task_schedule(doc_schedule.name, ex)
+
+def _send_reload_request(task_schedule_id, socket_path):
+	"""
+	Ask the BTU Scheduler daemon to reload a Task Schedule, using a socket path that was already read.
+	"""
+	return SchedulerAPI().send_message(RequestType.create_task_schedule, content=task_schedule_id, socket_path=socket_path)
+
+def _process_reload_response(response):
+	"""
+	Raise an error if the BTU Scheduler daemon did not accept the reload request; otherwise display its response.
+	"""
+	if not response:
+		raise ConnectionError("Error, no response from BTU Task Scheduler daemon.  Check logs in directory '/etc/btu_scheduler.logs'")
+	if response.startswith('Exception while connecting'):
+		raise ConnectionError(response)
+	print(f"Response from BTU Scheduler: {response}")
+	frappe.msgprint(f"Response from BTU Scheduler daemon:<br>{response}")
+
+def _disable_task_schedule(task_schedule_id, ex):
+	"""
+	Report an error while submitting a Task Schedule, and then disable it.
+	NOTE: The document is not saved, because save() would run validate() and fail again for the same reason.
+	"""
+	message = f"Error from BTU Scheduler while submitting Task {task_schedule_id} : {ex}"
+	frappe.msgprint(message)
+	print(message)
+	try:
+		frappe.db.set_value("BTU Task Schedule", task_schedule_id, {"enabled": 0, "redis_job_id": ""})
+		SchedulerAPI.cancel_task_schedule(task_schedule_id=task_schedule_id)
+	except Exception as disable_ex:
+		# One bad Task Schedule must not stop the others from being resubmitted.
+		message = f"Unable to disable Task Schedule {task_schedule_id} : {disable_ex}"
+		frappe.msgprint(message)
+		print(message)
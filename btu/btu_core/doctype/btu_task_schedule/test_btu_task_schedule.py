@@ -2,6 +2,96 @@
 # See license.txt
 
 import unittest
+from unittest.mock import patch
+
+import frappe
+
+from btu import validate_cron_string
+from btu.btu_api.scheduler import SchedulerAPI
+from btu.btu_core.doctype.btu_task_schedule import btu_task_schedule
+from btu.btu_core.doctype.btu_task_schedule.btu_task_schedule import check_hours, check_minutes, resubmit_all_task_schedules, schedule_to_cron_string
+from btu.patches.v0_7 import convert_argument_overrides_to_json
+
 
 class TestBTUTaskSchedule(unittest.TestCase):
-	pass
+
+	def test_check_minutes(self):
+		for minute in (0, 59, "0", "05"):
+			check_minutes(minute)  # should not raise
+		for minute in (60, -1, "", None):
+			with self.assertRaises(ValueError):
+				check_minutes(minute)
+
+	def test_check_hours(self):
+		for hour in ("0", "00", "23", 0):
+			check_hours(hour)  # should not raise
+		for hour in ("24", "-1", "", None):
+			with self.assertRaises(ValueError):
+				check_hours(hour)
+
+	def test_validate_cron_string(self):
+		for cron_string in ("0 22 * * 1-5", "*/5 * * * *", "5 3 * * Mon", "0 2 15 JAN *"):
+			self.assertTrue(validate_cron_string(cron_string))
+		for cron_string in ("0 5 * * 1garbage", "5 3.0 * * *", "60 * * * *", "0 5 * *"):
+			self.assertFalse(validate_cron_string(cron_string))
+
+	def test_built_in_arguments_json(self):
+		doc_schedule = frappe.new_doc("BTU Task Schedule")
+		doc_schedule.argument_overrides = '{"a": [1, 2], "b": null}'
+		self.assertEqual(doc_schedule.built_in_arguments(), {"a": [1, 2], "b": None})
+
+	def test_built_in_arguments_python_literal(self):
+		doc_schedule = frappe.new_doc("BTU Task Schedule")
+		doc_schedule.argument_overrides = "{'a': (1, 2), 1: 'x'}"
+		self.assertEqual(doc_schedule.built_in_arguments(), {"a": (1, 2), 1: "x"})
+
+	def test_built_in_arguments_returns_copy(self):
+		doc_schedule = frappe.new_doc("BTU Task Schedule")
+		doc_schedule.argument_overrides = "{'a': [1], 'b': None}"
+		arguments = doc_schedule.built_in_arguments()
+		arguments["a"].append(2)
+		arguments["c"] = 3
+		self.assertEqual(doc_schedule.built_in_arguments(), {"a": [1], "b": None})
+
+	def test_patch_skips_values_that_change_as_json(self):
+		rows = [
+			frappe._dict(name="TS-1", argument_overrides="{'a': [1], 'b': None}"),  # converts cleanly
+			frappe._dict(name="TS-2", argument_overrides="{'a': (1, 2)}"),  # tuple would become a list
+			frappe._dict(name="TS-3", argument_overrides="{1: 'x'}"),  # key would become a string
+			frappe._dict(name="TS-4", argument_overrides='{"a": 1}'),  # already JSON
+		]
+		with patch.object(frappe.db, "get_all", return_value=rows), patch.object(frappe.db, "set_value") as mock_set_value:
+			convert_argument_overrides_to_json.execute()
+		mock_set_value.assert_called_once_with("BTU Task Schedule", "TS-1", "argument_overrides",
+		                                       '{"a": [1], "b": null}', update_modified=False)
+
+	def test_schedule_to_cron_string_daily(self):
+		doc_schedule = frappe.new_doc("BTU Task Schedule")
+		doc_schedule.run_frequency = "Daily"
+		doc_schedule.minute = 5
+		for hour, utc_offset, expected in (("8", -5.0, "5 13 * * *"),  # behind UTC
+		                                   ("22", -5.0, "5 3 * * *"),  # wraps past midnight
+		                                   ("2", 5.0, "5 21 * * *"),  # wraps before midnight
+		                                   ("0", 0.0, "5 0 * * *")):
+			doc_schedule.hour = hour
+			with patch.object(btu_task_schedule, "get_utc_time_diff", return_value=utc_offset):
+				self.assertEqual(schedule_to_cron_string(doc_schedule), expected)
+
+	def test_resubmit_all_continues_past_invalid_schedule(self):
+		rows = [
+			frappe._dict(name="TS-1", task="TASK-1", run_frequency="Cron Style", cron_string="0 22 * * 1-5",
+			             minute=None, hour=None, day_of_month=None, day_of_week=None, month=None),
+			frappe._dict(name="TS-2", task="TASK-1", run_frequency="Daily", cron_string=None,
+			             minute=5, hour="24", day_of_month=None, day_of_week=None, month=None),  # invalid hour
+		]
+		with patch.object(frappe.db, "get_all", return_value=rows), \
+		     patch.object(frappe.db, "set_value") as mock_set_value, \
+		     patch.object(frappe, "msgprint"), \
+		     patch.object(SchedulerAPI, "get_socket_path", return_value="/tmp/btu_scheduler.sock"), \
+		     patch.object(SchedulerAPI, "cancel_task_schedule") as mock_cancel, \
+		     patch.object(btu_task_schedule, "_send_reload_request", return_value="OK") as mock_send:
+			resubmit_all_task_schedules()
+
+		mock_send.assert_called_once_with("TS-1", "/tmp/btu_scheduler.sock")
+		mock_set_value.assert_called_once_with("BTU Task Schedule", "TS-2", {"enabled": 0, "redis_job_id": ""})
+		mock_cancel.assert_called_once_with(task_schedule_id="TS-2")
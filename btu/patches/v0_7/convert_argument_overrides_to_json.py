@@ -0,0 +1,33 @@
+# Copyright (c) 2022, Datahenge LLC and contributors
+# For license information, please see license.txt
+
+import ast
+import json
+
+import frappe
+
+
+def execute():
+	"""
+	Convert BTU Task Schedule 'argument_overrides' from Python literals into JSON.
+	"""
+	task_schedules = frappe.db.get_all("BTU Task Schedule",
+	                                   filters={"argument_overrides": ("is", "set")},
+	                                   fields=["name", "argument_overrides"])
+	for each in task_schedules:
+		try:
+			json.loads(each.argument_overrides)
+			continue  # already JSON
+		except json.JSONDecodeError:
+			pass
+		try:
+			original = ast.literal_eval(each.argument_overrides)
+			new_value = json.dumps(original)
+		except (ValueError, SyntaxError, TypeError) as ex:
+			print(f"Unable to convert arguments on Task Schedule {each.name} to JSON: {ex}")
+			continue
+		if json.loads(new_value) != original:
+			# JSON cannot represent this value exactly (e.g. tuples, or non-string keys).  Leave the Python literal alone.
+			print(f"Arguments on Task Schedule {each.name} cannot be stored as JSON without changing them; leaving as-is.")
+			continue
+		frappe.db.set_value("BTU Task Schedule", each.name, "argument_overrides", new_value, update_modified=False)